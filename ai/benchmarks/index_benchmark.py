@@ -0,0 +1,187 @@
+"""
+Index Benchmark Module
+
+This module measures the effect of the indexes proposed by the index advisor
+on large synthetic datasets. It builds copies of the 'expense', 'income' and
+'investment' tables in a scratch schema, runs a workload of agent-style queries,
+applies the recommended indexes and runs the workload again.
+"""
+
+import argparse
+import statistics
+from typing import Dict, List
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, text
+from tools.db_tool import get_database_uri
+from tools.index_advisor import IndexAdvisor, IndexRecommendation
+
+
+BENCHMARK_SCHEMA = "index_benchmark"
+
+# Tables mirroring the backend migrations
+TABLE_DEFINITIONS = [
+    """CREATE TABLE "expense" ("id" uuid NOT NULL DEFAULT gen_random_uuid(), "amount" integer NOT NULL, "description" character varying, "category" character varying NOT NULL, "importance" character varying, "date" TIMESTAMP NOT NULL, "location" character varying, "createdAt" TIMESTAMP NOT NULL DEFAULT now(), "updatedAt" TIMESTAMP NOT NULL DEFAULT now(), PRIMARY KEY ("id"))""",
+    """CREATE TABLE "income" ("id" uuid NOT NULL DEFAULT gen_random_uuid(), "amount" integer NOT NULL, "source" character varying NOT NULL, "date" TIMESTAMP NOT NULL, "description" character varying, "createdAt" TIMESTAMP NOT NULL DEFAULT now(), "updatedAt" TIMESTAMP NOT NULL DEFAULT now(), PRIMARY KEY ("id"))""",
+    """CREATE TABLE "investment" ("id" uuid NOT NULL DEFAULT gen_random_uuid(), "amount" integer NOT NULL, "type" character varying NOT NULL, "date" TIMESTAMP NOT NULL, "description" character varying, "createdAt" TIMESTAMP NOT NULL DEFAULT now(), "updatedAt" TIMESTAMP NOT NULL DEFAULT now(), PRIMARY KEY ("id"))"""
+]
+
+# Synthetic rows spread over ten years in date order, like records entered over time
+POPULATE_STATEMENTS = [
+    """INSERT INTO "expense" ("amount", "description", "category", "importance", "date", "location")
+    SELECT (random() * 20000)::int, 'Synthetic expense ' || g,
+        (ARRAY['Food', 'Rent', 'Transport', 'Utilities', 'Entertainment', 'Health', 'Shopping', 'Travel'])[1 + g % 8],
+        (ARRAY['low', 'medium', 'high'])[1 + g % 3],
+        TIMESTAMP '2015-01-01' + interval '3650 days' * (g::float8 / :rows),
+        (ARRAY['Bucharest', 'Cluj', 'Online'])[1 + g % 3]
+    FROM generate_series(1, :rows) AS g""",
+    """INSERT INTO "income" ("amount", "source", "date", "description")
+    SELECT (random() * 500000)::int,
+        (ARRAY['Salary', 'Freelance', 'Dividends', 'Rent', 'Gifts'])[1 + g % 5],
+        TIMESTAMP '2015-01-01' + interval '3650 days' * (g::float8 / :rows),
+        'Synthetic income ' || g
+    FROM generate_series(1, :rows) AS g""",
+    """INSERT INTO "investment" ("amount", "type", "date", "description")
+    SELECT (random() * 1000000)::int,
+        (ARRAY['Stocks', 'ETF', 'Bonds', 'Crypto', 'Real estate', 'Deposit'])[1 + g % 6],
+        TIMESTAMP '2015-01-01' + interval '3650 days' * (g::float8 / :rows),
+        'Synthetic investment ' || g
+    FROM generate_series(1, :rows) AS g"""
+]
+
+# Queries of the shape the SQL agent generates for typical questions
+WORKLOAD = {
+    "expenses last month": """SELECT SUM(amount) FROM expense WHERE date >= '2024-11-01' AND date < '2024-12-01'""",
+    "groceries in 2023": """SELECT SUM(amount) FROM expense WHERE category = 'Food' AND date >= '2023-01-01' AND date < '2024-01-01'""",
+    "spending by category this quarter": """SELECT category, SUM(amount) AS total FROM expense WHERE date >= '2024-10-01' AND date < '2025-01-01' GROUP BY category ORDER BY total DESC""",
+    "salary in 2024": """SELECT SUM(amount) FROM income WHERE source = 'Salary' AND date >= '2024-01-01' AND date < '2025-01-01'""",
+    "income last week": """SELECT source, amount, date FROM income WHERE date >= '2024-12-23' AND date < '2024-12-30' ORDER BY date""",
+    "ETF purchases this year": """SELECT date, amount FROM investment WHERE type = 'ETF' AND date >= '2024-01-01' ORDER BY date"""
+}
+
+
+class IndexBenchmark:
+    """
+    Before/after benchmark for the index advisor recommendations.
+    """
+
+    def __init__(self, db_uri: str, repeat: int = 5):
+        """
+        Initialize the Index Benchmark.
+
+        Args:
+            db_uri: The database connection string
+            repeat: Number of runs per query, the median execution time is reported
+        """
+        self.engine = create_engine(db_uri)
+        self.advisor = IndexAdvisor(db_uri, schema=BENCHMARK_SCHEMA)
+        self.repeat = repeat
+
+    def setup(self, rows: int) -> None:
+        """
+        Create the scratch schema and fill it with synthetic rows.
+
+        Args:
+            rows: Number of rows per table
+        """
+        with self.engine.begin() as conn:
+            conn.execute(text(f'DROP SCHEMA IF EXISTS "{BENCHMARK_SCHEMA}" CASCADE'))
+            conn.execute(text(f'CREATE SCHEMA "{BENCHMARK_SCHEMA}"'))
+            conn.execute(text(f'SET LOCAL search_path TO "{BENCHMARK_SCHEMA}"'))
+
+            for statement in TABLE_DEFINITIONS:
+                conn.execute(text(statement))
+            for statement in POPULATE_STATEMENTS:
+                conn.execute(text(statement), {"rows": rows})
+
+        self._analyze()
+
+    def teardown(self) -> None:
+        """Drop the scratch schema."""
+        with self.engine.begin() as conn:
+            conn.execute(text(f'DROP SCHEMA IF EXISTS "{BENCHMARK_SCHEMA}" CASCADE'))
+
+    def apply(self, recommendations: List[IndexRecommendation]) -> None:
+        """
+        Create the recommended indexes in the scratch schema.
+
+        Args:
+            recommendations: The indexes to create
+        """
+        with self.engine.begin() as conn:
+            conn.execute(text(f'SET LOCAL search_path TO "{BENCHMARK_SCHEMA}"'))
+            for recommendation in recommendations:
+                conn.execute(text(recommendation.create_sql()))
+
+        self._analyze()
+
+    def measure(self) -> Dict[str, Dict[str, float]]:
+        """
+        Run the workload and collect the median execution time and buffer usage per query.
+
+        Returns:
+            Dict: Execution time in milliseconds and shared blocks touched, keyed by query name
+        """
+        results = {}
+        for name, sql in WORKLOAD.items():
+            analyses = [self.advisor.explain(sql) for _ in range(self.repeat)]
+            results[name] = {
+                "time_ms": statistics.median(a.execution_time_ms for a in analyses),
+                "blocks": analyses[-1].shared_hit_blocks + analyses[-1].shared_read_blocks
+            }
+
+        return results
+
+    def run(self, rows: int) -> None:
+        """
+        Run the full before/after benchmark for one dataset size.
+
+        Args:
+            rows: Number of rows per table
+        """
+        print(f"\n=== {rows:,} rows per table ===")
+        self.setup(rows)
+
+        before = self.measure()
+        recommendations = self.advisor.recommend(list(WORKLOAD.values()))
+        for recommendation in recommendations:
+            print(recommendation.create_sql())
+
+        self.apply(recommendations)
+        after = self.measure()
+
+        print(f"{'query':<36}{'before ms':>12}{'after ms':>12}{'speedup':>10}{'blocks before':>16}{'blocks after':>15}")
+        for name in WORKLOAD:
+            speedup = before[name]["time_ms"] / max(after[name]["time_ms"], 0.001)
+            print(f"{name:<36}{before[name]['time_ms']:>12.2f}{after[name]['time_ms']:>12.2f}{speedup:>9.1f}x"
+                  f"{before[name]['blocks']:>16,.0f}{after[name]['blocks']:>15,.0f}")
+
+    def _analyze(self) -> None:
+        with self.engine.begin() as conn:
+            for table in ("expense", "income", "investment"):
+                conn.execute(text(f'ANALYZE "{BENCHMARK_SCHEMA}"."{table}"'))
+
+
+def main():
+    """
+    Run the index benchmark for the requested dataset sizes.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the index advisor on synthetic data")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100000, 1000000],
+                        help="Dataset sizes, in rows per table")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per query")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch schema after the last run")
+    args = parser.parse_args()
+
+    load_dotenv()
+
+    benchmark = IndexBenchmark(get_database_uri(), repeat=args.repeat)
+    try:
+        for rows in args.rows:
+            benchmark.run(rows)
+    finally:
+        if not args.keep:
+            benchmark.teardown()
+
+
+if __name__ == "__main__":
+    main()
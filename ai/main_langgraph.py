@@ -9,17 +9,17 @@ import os
 import sys
 import logging
 import traceback
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
 from langchain.agents import AgentExecutor
 from langchain.tools import Tool
 from langchain.agents import create_tool_calling_agent
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain.memory import ConversationBufferMemory
-from langchain.schema import SystemMessage
+from langchain.schema import SystemMessage, HumanMessage, AIMessage, BaseMessage
 from tools.db_tool import DatabaseTool
 from tools.investment_tool import InvestmentTool
+from models.tiers import ModelTier, ModelTierManager, TierConfig
 
 # Configure logging
 logging.basicConfig(
@@ -38,29 +38,64 @@ class BudgetAssistantAI:
 
     This class provides a natural language interface to query financial data
     stored in a PostgreSQL database using LangChain's AgentExecutor.
+    The agent picks and runs the tools on the router tier, then a single call
+    on the synthesis tier writes the final answer from the tool results.
+    Questions that need no tools are answered by the router directly.
     """
 
-    def __init__(self, model_name: str = "gpt-4o", temperature: float = 0.4):
+    SYSTEM_MESSAGE = """You are a helpful financial assistant that can answer questions about the user's personal finances.
+        You have access to the user's financial database which contains information about their expenses, income, and investments.
+        You can also provide information about Apple stock performance.
+
+        When analyzing financial data:
+        - For expenses: Focus on categories, amounts, dates, and patterns
+        - For income: Look at sources, frequency, and trends
+        - For investments: Consider performance, allocation, and growth
+
+        Always format currency values properly with the appropriate symbol.
+        Present numerical data in a clear, readable format.
+        When showing date ranges or time periods, be specific about the timeframe.
+
+        If you need to perform calculations:
+        - Be precise with mathematical operations
+        - Show your reasoning when appropriate
+        - Round monetary values to two decimal places
+
+        If you don't know the answer to a question, say so. Do not make up information."""
+
+    def __init__(
+        self,
+        model_name: str = "gpt-4o",
+        temperature: float = 0.4,
+        tier_configs: Optional[Dict[ModelTier, TierConfig]] = None
+    ):
         """
         Initialize the Budget Assistant AI.
 
         Args:
-            model_name: The name of the OpenAI model to use
-            temperature: The temperature for the model
+            model_name: The name of the OpenAI model to use for the final answer, ignored if tier_configs is given
+            temperature: The temperature for the final answer model, ignored if tier_configs is given
+            tier_configs: The backend of each model tier, read from the environment if not given
         """
         # Load environment variables
         load_dotenv()
 
+        # Map each stage to its model tier
+        self.models = ModelTierManager(tier_configs) if tier_configs else ModelTierManager.from_env(model_name, temperature)
+
         # Check if API key is available
-        if not os.getenv("OPENAI_API_KEY"):
+        if self.models.requires_openai_key() and not os.getenv("OPENAI_API_KEY"):
             raise ValueError("OPENAI_API_KEY environment variable is not set. Please create a .env file with your API key.")
 
-        logger.info(f"Initializing LLM with model: {model_name}")
-        # Initialize the LLM
-        self.llm = ChatOpenAI(
-            model_name=model_name,
-            temperature=temperature
-        )
+        for tier, config in self.models.configs.items():
+            logger.info(f"Initializing {tier.value} tier with model: {config.model_name}"
+                        + (f" at {config.base_url}" if config.base_url else ""))
+        # The agent only chooses and runs tools, the final answer is written by the synthesis tier
+        self.router_llm: ChatOpenAI = self.models.get_llm(ModelTier.ROUTER)
+        self.synthesis_llm: ChatOpenAI = self.models.get_llm(ModelTier.SYNTHESIS)
+
+        # The conversation so far, as seen by the user
+        self.chat_history: List[BaseMessage] = []
 
         # Initialize tools
         logger.info("Initializing tools")
@@ -77,8 +112,12 @@ class BudgetAssistantAI:
         Returns:
             List[Tool]: The tools for the agent
         """
-        # Initialize the database tool
-        db_tool = DatabaseTool(self.llm)
+        # Initialize the database tool, escalating failed SQL to the larger model
+        db_tool = DatabaseTool(
+            self.models.get_llm(ModelTier.SQL),
+            escalation_llm=self.models.get_escalation_llm(ModelTier.SQL),
+            on_escalation=lambda: self.models.record_escalation(ModelTier.SQL)
+        )
 
         # Initialize the investment tool
         investment_tool = InvestmentTool()
@@ -88,6 +127,8 @@ class BudgetAssistantAI:
             Tool.from_function(
                 func=db_tool.query_database,
                 name="query_financial_database",
+                # Stop the router after the tool, the synthesis tier writes the answer
+                return_direct=True,
                 description="""Use this tool to query the user's financial database for information about expenses, income, and investments.
                 This tool can translate natural language questions into SQL and retrieve data from the database.
                 Examples:
@@ -99,6 +140,7 @@ class BudgetAssistantAI:
             Tool.from_function(
                 func=investment_tool.get_apple_stock_data,
                 name="get_apple_stock_data",
+                return_direct=True,
                 description="""Use this tool to get current Apple stock data including price, daily change percentage, and weekly performance.
                 This is useful when the user asks about Apple stock or wants to know about their Apple investment.
                 Examples:
@@ -117,36 +159,9 @@ class BudgetAssistantAI:
         Returns:
             AgentExecutor: The agent executor
         """
-        # Create a conversation memory
-        memory = ConversationBufferMemory(
-            memory_key="chat_history",
-            return_messages=True
-        )
-
-        # Create the system message
-        system_message = """You are a helpful financial assistant that can answer questions about the user's personal finances.
-        You have access to the user's financial database which contains information about their expenses, income, and investments.
-        You can also provide information about Apple stock performance.
-
-        When analyzing financial data:
-        - For expenses: Focus on categories, amounts, dates, and patterns
-        - For income: Look at sources, frequency, and trends
-        - For investments: Consider performance, allocation, and growth
-
-        Always format currency values properly with the appropriate symbol.
-        Present numerical data in a clear, readable format.
-        When showing date ranges or time periods, be specific about the timeframe.
-
-        If you need to perform calculations:
-        - Be precise with mathematical operations
-        - Show your reasoning when appropriate
-        - Round monetary values to two decimal places
-
-        If you don't know the answer to a question, say so. Do not make up information."""
-
         # Create the prompt
         prompt = ChatPromptTemplate.from_messages([
-            SystemMessage(content=system_message),
+            SystemMessage(content=self.SYSTEM_MESSAGE),
             MessagesPlaceholder(variable_name="chat_history"),
             ("human", "{input}"),
             MessagesPlaceholder(variable_name="agent_scratchpad")
@@ -154,18 +169,18 @@ class BudgetAssistantAI:
 
         # Create the agent
         agent = create_tool_calling_agent(
-            llm=self.llm,
+            llm=self.router_llm,
             tools=self.tools,
             prompt=prompt
         )
 
-        # Create the agent executor
+        # Create the agent executor, returning the tool results for the synthesis step
         agent_executor = AgentExecutor(
             agent=agent,
             tools=self.tools,
-            memory=memory,
             verbose=True,
-            handle_parsing_errors=True
+            handle_parsing_errors=True,
+            return_intermediate_steps=True
         )
 
         return agent_executor
@@ -184,16 +199,62 @@ class BudgetAssistantAI:
             logger.info(f"Processing query: {query}")
 
             # Run the agent with the query
-            result = self.agent_executor.invoke({"input": query})
+            result = self.agent_executor.invoke({"input": query, "chat_history": self.chat_history})
             logger.info("Agent execution completed successfully")
 
+            # Write the final answer from the tool results, if the router used any
+            intermediate_steps = result["intermediate_steps"]
+            output = self._synthesize(query, intermediate_steps) if intermediate_steps else result["output"]
+            self.chat_history.extend([HumanMessage(content=query), AIMessage(content=output)])
+            self._log_usage()
+
             # Return the final response
-            return {"output": result["output"]}
+            return {"output": output}
         except Exception as e:
             logger.error(f"Error processing query: {str(e)}")
             logger.error(f"Traceback: {traceback.format_exc()}")
             return {"error": str(e), "output": f"Error processing query: {str(e)}"}
 
+    def _synthesize(self, query: str, intermediate_steps: List[Tuple[Any, Any]]) -> str:
+        """
+        Write the final answer on the synthesis tier.
+
+        Args:
+            query: The natural language query
+            intermediate_steps: The tool calls made by the agent and their results
+
+        Returns:
+            The final answer
+        """
+        tool_results = "\n".join(
+            f"- {action.tool}({action.tool_input}): {observation}"
+            for action, observation in intermediate_steps
+        )
+        content = f"{query}\n\nResults of the tools you used to answer this question:\n{tool_results}"
+
+        messages = [SystemMessage(content=self.SYSTEM_MESSAGE), *self.chat_history, HumanMessage(content=content)]
+        return self.synthesis_llm.invoke(messages).content
+
+    def get_usage_report(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the latency, token and cost accounting of each model tier.
+
+        Returns:
+            A dictionary with the usage of each tier, keyed by tier name
+        """
+        return self.models.usage_report()
+
+    def _log_usage(self) -> None:
+        """
+        Log the cumulative usage of each model tier.
+        """
+        for tier, usage in self.get_usage_report().items():
+            logger.info(
+                f"Tier {tier} ({usage['model']}): {usage['calls']} calls, "
+                f"{usage['latency_ms']:.0f} ms, {usage['prompt_tokens']}+{usage['completion_tokens']} tokens, "
+                f"${usage['cost']:.4f}, {usage['escalations']} escalations"
+            )
+
 
 def run_test_cases():
     """
@@ -0,0 +1,338 @@
+"""
+Model Tiers Module
+
+This module maps each stage of the Budget Assistant (routing, SQL generation and
+synthesis of the final answer) to its own model backend, so that intermediate
+steps can run on a cheap or local model while the final prose uses a larger one.
+It also keeps latency, token and cost accounting per tier.
+"""
+
+import os
+import time
+from enum import Enum
+from typing import Dict, Any, List, Optional, Tuple
+from uuid import UUID
+from pydantic import BaseModel, Field
+from langchain_openai import ChatOpenAI
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+
+class ModelTier(str, Enum):
+    """
+    The stages of the Budget Assistant that each declare a model tier.
+    """
+
+    ROUTER = "router"
+    SQL = "sql"
+    SYNTHESIS = "synthesis"
+
+
+# Price in USD per million input and output tokens for known OpenAI models
+MODEL_PRICES = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40)
+}
+
+# Tier a failing stage is retried on
+ESCALATION = {
+    ModelTier.SQL: ModelTier.SYNTHESIS
+}
+
+
+class TierConfig(BaseModel):
+    """
+    Backend configuration of a model tier.
+
+    Setting base_url points the tier at any OpenAI-compatible server, such as a
+    local Ollama, llama.cpp or vLLM instance for offline testing.
+    """
+
+    model_name: str = Field(description="The model to use")
+    temperature: float = Field(default=0.0, description="The temperature for the model")
+    base_url: Optional[str] = Field(
+        default=None,
+        description="URL of an OpenAI-compatible server, or None for the OpenAI API"
+    )
+    api_key: Optional[str] = Field(
+        default=None,
+        description="API key for the server, or None to use OPENAI_API_KEY"
+    )
+    input_cost_per_million: float = Field(default=0.0, description="USD per million input tokens")
+    output_cost_per_million: float = Field(default=0.0, description="USD per million output tokens")
+
+    @classmethod
+    def from_env(cls, tier: ModelTier, default_model: str, temperature: float = 0.0) -> "TierConfig":
+        """
+        Create a tier configuration from environment variables.
+
+        The variables are prefixed with the tier name, e.g. SQL_MODEL, SQL_BASE_URL,
+        SQL_API_KEY, SQL_INPUT_COST and SQL_OUTPUT_COST. LLM_BASE_URL sets the
+        server for every tier that does not set its own.
+
+        Args:
+            tier: The tier to configure
+            default_model: The model to use when {TIER}_MODEL is not set
+            temperature: The temperature for the model
+
+        Returns:
+            TierConfig: The tier configuration
+        """
+        prefix = tier.value.upper()
+        model_name = os.getenv(f"{prefix}_MODEL", default_model)
+        base_url = os.getenv(f"{prefix}_BASE_URL", os.getenv("LLM_BASE_URL")) or None
+
+        # Local servers are free, OpenAI models default to their list price
+        input_cost, output_cost = (0.0, 0.0) if base_url else MODEL_PRICES.get(model_name, (0.0, 0.0))
+
+        return cls(
+            model_name=model_name,
+            temperature=temperature,
+            base_url=base_url,
+            api_key=os.getenv(f"{prefix}_API_KEY") or None,
+            input_cost_per_million=float(os.getenv(f"{prefix}_INPUT_COST", input_cost)),
+            output_cost_per_million=float(os.getenv(f"{prefix}_OUTPUT_COST", output_cost))
+        )
+
+    def create_llm(self, callbacks: Optional[List[BaseCallbackHandler]] = None) -> ChatOpenAI:
+        """
+        Create the chat model for this tier.
+
+        Args:
+            callbacks: Callback handlers to attach to the model
+
+        Returns:
+            ChatOpenAI: The chat model
+        """
+        kwargs: Dict[str, Any] = {}
+        if self.base_url:
+            kwargs["base_url"] = self.base_url
+            # Local servers usually ignore the key, but the client requires one
+            kwargs["api_key"] = self.api_key or "not-needed"
+        elif self.api_key:
+            kwargs["api_key"] = self.api_key
+
+        # AgentExecutor streams the model, and streamed responses only carry token usage with stream_usage
+        return ChatOpenAI(
+            model_name=self.model_name,
+            temperature=self.temperature,
+            stream_usage=True,
+            callbacks=callbacks,
+            **kwargs
+        )
+
+
+class TierUsage(BaseModel):
+    """
+    Latency, token and cost accounting for a model tier.
+    """
+
+    calls: int = Field(default=0, description="Number of model calls")
+    failures: int = Field(default=0, description="Number of model calls that raised an error")
+    escalations: int = Field(default=0, description="Number of times the stage was retried on a larger tier")
+    prompt_tokens: int = Field(default=0, description="Total input tokens")
+    completion_tokens: int = Field(default=0, description="Total output tokens")
+    latency_ms: float = Field(default=0.0, description="Total time spent waiting for the model")
+    cost: float = Field(default=0.0, description="Total cost in USD")
+
+
+class TierUsageCallback(BaseCallbackHandler):
+    """
+    Callback handler that records the usage of a tier's model calls.
+    """
+
+    def __init__(self, config: TierConfig, usage: TierUsage):
+        """
+        Initialize the usage callback.
+
+        Args:
+            config: The configuration of the tier, used for pricing
+            usage: The usage record to update
+        """
+        self.config = config
+        self.usage = usage
+        self._started: Dict[UUID, float] = {}
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[Any]], *, run_id: UUID, **kwargs: Any) -> None:
+        """Record when a chat model call starts."""
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], *, run_id: UUID, **kwargs: Any) -> None:
+        """Record when a completion model call starts."""
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        """Record the latency, tokens and cost of a finished call."""
+        self._record_latency(run_id)
+        self.usage.calls += 1
+
+        prompt_tokens, completion_tokens = self._token_usage(response)
+        self.usage.prompt_tokens += prompt_tokens
+        self.usage.completion_tokens += completion_tokens
+        self.usage.cost += (
+            prompt_tokens * self.config.input_cost_per_million
+            + completion_tokens * self.config.output_cost_per_million
+        ) / 1_000_000
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        """Record the latency of a failed call."""
+        self._record_latency(run_id)
+        self.usage.calls += 1
+        self.usage.failures += 1
+
+    def _record_latency(self, run_id: UUID) -> None:
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            self.usage.latency_ms += (time.perf_counter() - started) * 1000
+
+    @staticmethod
+    def _token_usage(response: LLMResult) -> Tuple[int, int]:
+        token_usage = (response.llm_output or {}).get("token_usage") or {}
+        if token_usage:
+            return token_usage.get("prompt_tokens", 0), token_usage.get("completion_tokens", 0)
+
+        # Streaming responses only report usage on the message
+        prompt_tokens = completion_tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                usage_metadata = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                prompt_tokens += usage_metadata.get("input_tokens", 0)
+                completion_tokens += usage_metadata.get("output_tokens", 0)
+
+        return prompt_tokens, completion_tokens
+
+
+class ModelTierManager:
+    """
+    Registry of the model backends used by each tier.
+
+    This class creates one chat model per tier, tracks its usage and decides
+    which tier a failing stage escalates to.
+    """
+
+    def __init__(self, configs: Dict[ModelTier, TierConfig]):
+        """
+        Initialize the Model Tier Manager.
+
+        Args:
+            configs: The backend configuration of every tier
+        """
+        missing = [tier.value for tier in ModelTier if tier not in configs]
+        if missing:
+            raise ValueError(f"Missing model tier configuration for: {', '.join(missing)}")
+
+        self.configs = configs
+        self.usage = {tier: TierUsage() for tier in ModelTier}
+        self._llms: Dict[ModelTier, ChatOpenAI] = {}
+
+        # Retries on a larger tier are accounted separately from that tier's own calls
+        self.escalation_usage = {tier: TierUsage() for tier in ESCALATION}
+        self._escalation_llms: Dict[ModelTier, ChatOpenAI] = {}
+
+    @classmethod
+    def from_env(cls, model_name: str = "gpt-4o", temperature: float = 0.4) -> "ModelTierManager":
+        """
+        Create the tiers from environment variables.
+
+        Routing and SQL generation default to gpt-4o-mini with temperature 0,
+        synthesis defaults to the given model and temperature.
+
+        Args:
+            model_name: The default model for the synthesis tier
+            temperature: The temperature for the synthesis tier
+
+        Returns:
+            ModelTierManager: The model tier manager
+        """
+        return cls({
+            ModelTier.ROUTER: TierConfig.from_env(ModelTier.ROUTER, "gpt-4o-mini"),
+            ModelTier.SQL: TierConfig.from_env(ModelTier.SQL, "gpt-4o-mini"),
+            ModelTier.SYNTHESIS: TierConfig.from_env(ModelTier.SYNTHESIS, model_name, temperature)
+        })
+
+    def get_llm(self, tier: ModelTier) -> ChatOpenAI:
+        """
+        Get the chat model of a tier.
+
+        Args:
+            tier: The tier
+
+        Returns:
+            ChatOpenAI: The chat model, created on first use
+        """
+        if tier not in self._llms:
+            config = self.configs[tier]
+            self._llms[tier] = config.create_llm(callbacks=[TierUsageCallback(config, self.usage[tier])])
+
+        return self._llms[tier]
+
+    def get_escalation_llm(self, tier: ModelTier) -> Optional[ChatOpenAI]:
+        """
+        Get the chat model a failing stage of a tier is retried on.
+
+        The model uses the backend of the larger tier with the temperature of the
+        failing tier, and its usage is recorded in the tier's escalation bucket.
+
+        Args:
+            tier: The tier of the failing stage
+
+        Returns:
+            Optional[ChatOpenAI]: The larger model, or None if the tier has nothing to escalate to
+        """
+        target = ESCALATION.get(tier)
+        if target is None or self._same_backend(self.configs[tier], self.configs[target]):
+            return None
+
+        if tier not in self._escalation_llms:
+            config = self._escalation_config(tier)
+            callbacks = [TierUsageCallback(config, self.escalation_usage[tier])]
+            self._escalation_llms[tier] = config.create_llm(callbacks=callbacks)
+
+        return self._escalation_llms[tier]
+
+    def record_escalation(self, tier: ModelTier) -> None:
+        """
+        Record that a stage of a tier was retried on a larger tier.
+
+        Args:
+            tier: The tier of the failing stage
+        """
+        self.usage[tier].escalations += 1
+
+    def requires_openai_key(self) -> bool:
+        """
+        Check whether any tier uses the OpenAI API with the OPENAI_API_KEY variable.
+
+        Returns:
+            bool: True if OPENAI_API_KEY is needed
+        """
+        return any(config.base_url is None and config.api_key is None for config in self.configs.values())
+
+    def usage_report(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the usage accounting of every tier.
+
+        Returns:
+            Dict: The usage of each tier keyed by tier name, and of each escalation keyed by '{tier}_escalation'
+        """
+        report = {
+            tier.value: {"model": self.configs[tier].model_name, **self.usage[tier].model_dump()}
+            for tier in ModelTier
+        }
+        for tier, usage in self.escalation_usage.items():
+            report[f"{tier.value}_escalation"] = {
+                "model": self._escalation_config(tier).model_name,
+                **usage.model_dump()
+            }
+
+        return report
+
+    def _escalation_config(self, tier: ModelTier) -> TierConfig:
+        return self.configs[ESCALATION[tier]].model_copy(update={"temperature": self.configs[tier].temperature})
+
+    @staticmethod
+    def _same_backend(first: TierConfig, second: TierConfig) -> bool:
+        return first.model_name == second.model_name and first.base_url == second.base_url
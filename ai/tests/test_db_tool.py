@@ -0,0 +1,89 @@
+"""
+Tests for the Database Tool Module.
+
+The SQL agents are replaced by fakes that report their 'sql_db_query' calls to
+the callbacks, so no database or API key is needed.
+"""
+
+from uuid import uuid4
+from tools.db_tool import DatabaseTool
+
+
+class FakeAgent:
+    """Agent that runs the given SQL tool outputs, then returns its answer."""
+
+    def __init__(self, sql_outputs, output="answer", error=None):
+        self.sql_outputs = sql_outputs
+        self.output = output
+        self.error = error
+        self.calls = 0
+
+    def invoke(self, inputs, config):
+        self.calls += 1
+        if self.error:
+            raise self.error
+
+        for sql_output in self.sql_outputs:
+            run_id = uuid4()
+            for callback in config["callbacks"]:
+                callback.on_tool_start({"name": "sql_db_query"}, "SELECT 1", run_id=run_id)
+                callback.on_tool_end(sql_output, run_id=run_id)
+
+        return {"output": self.output}
+
+
+def make_tool(agent, escalation_agent=None):
+    # Skip __init__, which connects to the database
+    db_tool = DatabaseTool.__new__(DatabaseTool)
+    db_tool.agent = agent
+    db_tool.sql_logger = None
+    db_tool.escalation_llm = object() if escalation_agent else None
+    db_tool._escalation_agent = escalation_agent
+    db_tool.escalations = 0
+    db_tool.on_escalation = lambda: setattr(db_tool, "escalations", db_tool.escalations + 1)
+    return db_tool
+
+
+def test_run_agent_accepts_valid_sql():
+    assert make_tool(None)._run_agent(FakeAgent(["[(42,)]"]), "q") == ("answer", None)
+
+
+def test_run_agent_accepts_run_without_sql():
+    assert make_tool(None)._run_agent(FakeAgent([]), "q") == ("answer", None)
+
+
+def test_run_agent_accepts_recovered_sql_error():
+    agent = FakeAgent(['Error: column "ammount" does not exist', "[(42,)]"])
+
+    assert make_tool(None)._run_agent(agent, "q") == ("answer", None)
+
+
+def test_run_agent_flags_error_from_last_query():
+    error = 'Error: column "ammount" does not exist'
+
+    assert make_tool(None)._run_agent(FakeAgent(["[(42,)]", error]), "q") == ("answer", error)
+
+
+def test_run_agent_flags_iteration_limit():
+    output = "Agent stopped due to max iterations."
+
+    assert make_tool(None)._run_agent(FakeAgent([], output=output), "q") == (output, output)
+
+
+def test_query_database_escalates_failed_sql():
+    escalation_agent = FakeAgent(["[(42,)]"], output="escalated answer")
+    db_tool = make_tool(FakeAgent(["Error: syntax error"]), escalation_agent)
+
+    assert db_tool.query_database("q") == {"output": "escalated answer"}
+    assert db_tool.escalations == 1
+
+
+def test_query_database_does_not_escalate_agent_errors():
+    escalation_agent = FakeAgent([])
+    db_tool = make_tool(FakeAgent([], error=ConnectionError("connection refused")), escalation_agent)
+
+    result = db_tool.query_database("q")
+
+    assert result["error"] == "connection refused"
+    assert escalation_agent.calls == 0
+    assert db_tool.escalations == 0
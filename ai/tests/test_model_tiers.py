@@ -0,0 +1,128 @@
+"""
+Tests for the Model Tiers Module.
+
+None of these tests need an API key: local tiers point at an OpenAI-compatible
+server that is never called.
+"""
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+from models.tiers import ModelTier, ModelTierManager, TierConfig, TierUsage, TierUsageCallback
+
+
+TIER_ENV_VARIABLES = [
+    f"{tier.value.upper()}_{suffix}"
+    for tier in ModelTier
+    for suffix in ("MODEL", "BASE_URL", "API_KEY", "INPUT_COST", "OUTPUT_COST")
+] + ["LLM_BASE_URL"]
+
+LOCAL_URL = "http://localhost:11434/v1"
+
+
+@pytest.fixture(autouse=True)
+def clean_env(monkeypatch):
+    for variable in TIER_ENV_VARIABLES:
+        monkeypatch.delenv(variable, raising=False)
+
+
+def local_config(model_name, temperature=0.0):
+    return TierConfig(model_name=model_name, temperature=temperature, base_url=LOCAL_URL)
+
+
+def test_from_env_uses_default_model_and_list_price():
+    config = TierConfig.from_env(ModelTier.SQL, "gpt-4o-mini")
+
+    assert config.model_name == "gpt-4o-mini"
+    assert config.base_url is None
+    assert (config.input_cost_per_million, config.output_cost_per_million) == (0.15, 0.60)
+
+
+def test_from_env_tier_base_url_takes_precedence_over_llm_base_url(monkeypatch):
+    monkeypatch.setenv("LLM_BASE_URL", LOCAL_URL)
+    monkeypatch.setenv("SQL_BASE_URL", "http://localhost:8000/v1")
+    monkeypatch.setenv("SQL_MODEL", "qwen2.5-coder:7b")
+
+    sql = TierConfig.from_env(ModelTier.SQL, "gpt-4o-mini")
+    router = TierConfig.from_env(ModelTier.ROUTER, "gpt-4o-mini")
+
+    assert sql.base_url == "http://localhost:8000/v1"
+    assert sql.model_name == "qwen2.5-coder:7b"
+    assert router.base_url == LOCAL_URL
+
+
+def test_from_env_local_server_is_free(monkeypatch):
+    monkeypatch.setenv("SYNTHESIS_BASE_URL", LOCAL_URL)
+
+    config = TierConfig.from_env(ModelTier.SYNTHESIS, "gpt-4o", 0.4)
+
+    assert config.temperature == 0.4
+    assert (config.input_cost_per_million, config.output_cost_per_million) == (0.0, 0.0)
+
+
+def test_from_env_cost_override(monkeypatch):
+    monkeypatch.setenv("LLM_BASE_URL", LOCAL_URL)
+    monkeypatch.setenv("ROUTER_INPUT_COST", "0.5")
+
+    config = TierConfig.from_env(ModelTier.ROUTER, "llama3.2")
+
+    assert (config.input_cost_per_million, config.output_cost_per_million) == (0.5, 0.0)
+
+
+def test_token_usage_from_llm_output():
+    response = LLMResult(
+        generations=[[ChatGeneration(message=AIMessage(content="YES"))]],
+        llm_output={"token_usage": {"prompt_tokens": 120, "completion_tokens": 3, "total_tokens": 123}}
+    )
+
+    assert TierUsageCallback._token_usage(response) == (120, 3)
+
+
+def test_token_usage_from_streamed_usage_metadata():
+    message = AIMessage(content="YES", usage_metadata={"input_tokens": 120, "output_tokens": 3, "total_tokens": 123})
+    response = LLMResult(generations=[[ChatGeneration(message=message)]], llm_output={})
+
+    assert TierUsageCallback._token_usage(response) == (120, 3)
+
+
+def test_usage_callback_records_cost():
+    config = TierConfig(model_name="gpt-4o", input_cost_per_million=2.5, output_cost_per_million=10.0)
+    usage = TierUsage()
+    callback = TierUsageCallback(config, usage)
+    response = LLMResult(
+        generations=[[ChatGeneration(message=AIMessage(content="ok"))]],
+        llm_output={"token_usage": {"prompt_tokens": 1000, "completion_tokens": 100}}
+    )
+
+    callback.on_llm_end(response, run_id=None)
+
+    assert usage.calls == 1
+    assert (usage.prompt_tokens, usage.completion_tokens) == (1000, 100)
+    assert usage.cost == pytest.approx(0.0035)
+
+
+def test_escalation_is_skipped_when_sql_and_synthesis_share_a_backend():
+    manager = ModelTierManager({
+        ModelTier.ROUTER: local_config("llama3.2"),
+        ModelTier.SQL: local_config("llama3.1:8b"),
+        ModelTier.SYNTHESIS: local_config("llama3.1:8b", temperature=0.4)
+    })
+
+    assert manager.get_escalation_llm(ModelTier.SQL) is None
+    assert manager.get_escalation_llm(ModelTier.ROUTER) is None
+
+
+def test_escalation_model_is_separate_from_synthesis():
+    manager = ModelTierManager({
+        ModelTier.ROUTER: local_config("llama3.2"),
+        ModelTier.SQL: local_config("qwen2.5-coder:7b"),
+        ModelTier.SYNTHESIS: local_config("llama3.1:70b", temperature=0.4)
+    })
+
+    escalation_llm = manager.get_escalation_llm(ModelTier.SQL)
+
+    assert escalation_llm is not manager.get_llm(ModelTier.SYNTHESIS)
+    assert escalation_llm is manager.get_escalation_llm(ModelTier.SQL)
+    assert escalation_llm.model_name == "llama3.1:70b"
+    assert escalation_llm.temperature == 0.0
+    assert manager.usage_report()["sql_escalation"]["model"] == "llama3.1:70b"
@@ -5,12 +5,134 @@ This module provides a tool for querying the PostgreSQL database using natural l
 """
 
 import os
-from typing import Dict, Any
+import json
+import datetime
+from typing import Dict, Any, Callable, Optional, Set, Tuple
+from uuid import UUID
 from sqlalchemy import create_engine
 from langchain_community.utilities import SQLDatabase
 from langchain_openai import ChatOpenAI
 from langchain_community.agent_toolkits.sql.base import create_sql_agent
 from langchain_community.agent_toolkits.sql.toolkit import SQLDatabaseToolkit
+from langchain_core.callbacks import BaseCallbackHandler
+
+# Name of the LangChain tool that executes SQL against the database
+SQL_QUERY_TOOL_NAME = "sql_db_query"
+
+# Output of the agent executor when it gives up before reaching an answer
+AGENT_STOPPED_OUTPUT = "Agent stopped due to"
+
+
+def get_database_uri() -> str:
+    """
+    Build the PostgreSQL connection string from environment variables.
+    
+    Returns:
+        str: The database connection string
+    """
+    # Load database connection parameters from environment variables
+    db_host = os.getenv("DB_HOST", "localhost")
+    db_port = os.getenv("DB_PORT", "5433")  # Using 5433 to avoid conflicts with local PostgreSQL
+    db_name = os.getenv("DB_NAME", "budget_assistant")
+    db_user = os.getenv("DB_USER", "admin")
+    db_password = os.getenv("DB_PASSWORD", "admin")
+    
+    return f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
+
+
+def sql_tool_error(output: Any) -> Optional[str]:
+    """
+    Extract the database error from the output of the SQL query tool.
+    
+    The SQL tool reports database errors as its output instead of raising.
+    
+    Args:
+        output: The output of the tool
+    
+    Returns:
+        Optional[str]: The error message, or None if the query succeeded
+    """
+    output = str(getattr(output, "content", output))
+    return output if output.startswith("Error:") else None
+
+
+class SQLQueryLogger(BaseCallbackHandler):
+    """
+    Callback handler that logs the SQL executed by the SQL agent.
+    
+    Each statement passed to the 'sql_db_query' tool is appended as a JSON line
+    to the log file, together with any error returned by the database.
+    """
+    
+    def __init__(self, log_path: str):
+        """
+        Initialize the SQL query logger.
+        
+        Args:
+            log_path: Path of the JSON lines file to append the queries to
+        """
+        self.log_path = log_path
+        self._pending: Dict[UUID, str] = {}
+        
+        log_dir = os.path.dirname(log_path)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+    
+    def on_tool_start(self, serialized: Dict[str, Any], input_str: str, *, run_id: UUID, **kwargs: Any) -> None:
+        """Remember the SQL passed to the query tool until the tool finishes."""
+        if (serialized or {}).get("name") != SQL_QUERY_TOOL_NAME:
+            return
+        
+        inputs = kwargs.get("inputs") or {}
+        self._pending[run_id] = inputs.get("query", input_str)
+    
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        """Log the SQL once the tool has returned its result."""
+        sql = self._pending.pop(run_id, None)
+        if sql is None:
+            return
+        
+        self._write(sql, sql_tool_error(output))
+    
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        """Log the SQL together with the error raised by the tool."""
+        sql = self._pending.pop(run_id, None)
+        if sql is not None:
+            self._write(sql, str(error))
+    
+    def _write(self, sql: str, error: Optional[str]) -> None:
+        entry = {
+            "timestamp": datetime.datetime.now().isoformat(),
+            "sql": sql,
+            "error": error
+        }
+        with open(self.log_path, "a", encoding="utf-8") as log_file:
+            log_file.write(json.dumps(entry) + "\n")
+
+
+class SQLValidationTracker(BaseCallbackHandler):
+    """
+    Callback handler that tracks whether the SQL run by the agent was valid.
+    
+    The agent's SQL fails validation when the last statement it ran returned
+    a database error. Runs that needed no statement are valid.
+    """
+    
+    def __init__(self):
+        """Initialize the SQL validation tracker."""
+        self._sql_runs: Set[UUID] = set()
+        self.last_error: Optional[str] = None
+    
+    def on_tool_start(self, serialized: Dict[str, Any], input_str: str, *, run_id: UUID, **kwargs: Any) -> None:
+        """Remember calls to the SQL query tool."""
+        if (serialized or {}).get("name") == SQL_QUERY_TOOL_NAME:
+            self._sql_runs.add(run_id)
+    
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        """Record the result of a call to the SQL query tool."""
+        if run_id in self._sql_runs:
+            self._sql_runs.discard(run_id)
+            self.last_error = sql_tool_error(output)
 
 
 class DatabaseTool:
@@ -45,12 +167,19 @@ class DatabaseTool:
     You have access to tools that can list tables, get table schemas, and execute SQL queries.
     """
     
-    def __init__(self, llm: ChatOpenAI):
+    def __init__(
+        self,
+        llm: ChatOpenAI,
+        escalation_llm: Optional[ChatOpenAI] = None,
+        on_escalation: Optional[Callable[[], None]] = None
+    ):
         """
         Initialize the Database Tool.
         
         Args:
             llm: The language model to use for the SQL agent
+            escalation_llm: A larger model to retry with when the agent's SQL fails validation
+            on_escalation: Called each time a query is retried with the escalation model
         """
         # Connect to the database
         self.db = self._connect_to_database()
@@ -58,6 +187,15 @@ class DatabaseTool:
         # Create SQL toolkit and agent
         self.toolkit = SQLDatabaseToolkit(db=self.db, llm=llm)
         self.agent = self._create_sql_agent(llm)
+        
+        # The escalation agent is only created the first time it is needed
+        self.escalation_llm = escalation_llm
+        self.on_escalation = on_escalation
+        self._escalation_agent = None
+        
+        # Log the SQL generated by the agent for the index advisor, if enabled
+        sql_log_path = os.getenv("SQL_LOG_PATH")
+        self.sql_logger: Optional[SQLQueryLogger] = SQLQueryLogger(sql_log_path) if sql_log_path else None
     
     def _connect_to_database(self) -> SQLDatabase:
         """
@@ -66,15 +204,8 @@ class DatabaseTool:
         Returns:
             SQLDatabase: The connected database
         """
-        # Load database connection parameters from environment variables
-        db_host = os.getenv("DB_HOST", "localhost")
-        db_port = os.getenv("DB_PORT", "5433")  # Using 5433 to avoid conflicts with local PostgreSQL
-        db_name = os.getenv("DB_NAME", "budget_assistant")
-        db_user = os.getenv("DB_USER", "admin")
-        db_password = os.getenv("DB_PASSWORD", "admin")
-        
         # Create the database connection string
-        db_uri = f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
+        db_uri = get_database_uri()
         
         try:
             # Create the SQLAlchemy engine
@@ -122,10 +253,45 @@ class DatabaseTool:
             Dict: The agent's response
         """
         try:
-            # Run the agent with the query
-            result = self.agent.invoke({"input": query})
+            output, failure = self._run_agent(self.agent, query)
+            
+            # Retry with the larger model if the SQL failed validation
+            if failure and self.escalation_llm is not None:
+                print(f"Escalating query to the larger model: {failure}")
+                if self.on_escalation:
+                    self.on_escalation()
+                
+                if self._escalation_agent is None:
+                    self._escalation_agent = self._create_sql_agent(self.escalation_llm)
+                output, _ = self._run_agent(self._escalation_agent, query)
             
             # Return the result
-            return {"output": result["output"]}
+            return {"output": output}
         except Exception as e:
+            # Errors raised by the agent, such as network errors, are not retried
             return {"error": str(e), "output": f"Error querying database: {e}"}
+    
+    def _run_agent(self, agent, query: str) -> Tuple[str, Optional[str]]:
+        """
+        Run a SQL agent and validate the SQL it executed.
+        
+        Args:
+            agent: The SQL agent to run
+            query: The natural language query
+            
+        Returns:
+            Tuple: The agent's output, and the reason the run failed validation or None
+        """
+        tracker = SQLValidationTracker()
+        callbacks = [tracker, self.sql_logger] if self.sql_logger else [tracker]
+        
+        # Run the agent with the query
+        result = agent.invoke({"input": query}, config={"callbacks": callbacks})
+        output = result["output"]
+        
+        if tracker.last_error is not None:
+            return output, tracker.last_error
+        if output.startswith(AGENT_STOPPED_OUTPUT):
+            return output, output
+        
+        return output, None
@@ -0,0 +1,415 @@
+"""
+Index Advisor Module
+
+This module reads the SQL logged from the SQL agent, runs EXPLAIN (ANALYZE, BUFFERS)
+against a local PostgreSQL instance and proposes the indexes that would help,
+emitted as a TypeORM migration for the backend.
+"""
+
+import os
+import re
+import json
+import argparse
+import datetime
+from typing import Dict, Any, List, Optional, Tuple
+from dotenv import load_dotenv
+from pydantic import BaseModel, Field
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection
+from tools.db_tool import get_database_uri
+
+
+# Only read-only statements are explained, since EXPLAIN ANALYZE executes the query
+READ_ONLY_PATTERN = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+
+# Predicates PostgreSQL prints in a Filter, e.g. (date >= '...'::timestamp without time zone)
+# or ((category)::text = 'Food'::text). Function-wrapped columns are not matched on purpose,
+# since a plain index cannot serve them.
+PLAIN_PREDICATE_PATTERN = re.compile(r'\("?(\w+)"? (=|>=|<=|>|<) ')
+CAST_PREDICATE_PATTERN = re.compile(r'\(\("?(\w+)"?\)::[\w ]+? (=|>=|<=|>|<) ')
+
+EQUALITY_OPERATORS = {"="}
+RANGE_OPERATORS = {">=", "<=", ">", "<"}
+
+
+def load_query_log(log_path: str) -> List[str]:
+    """
+    Load the distinct, successfully executed SQL statements from a query log.
+
+    Args:
+        log_path: Path of the JSON lines file written by SQLQueryLogger
+
+    Returns:
+        List[str]: The distinct SQL statements, in the order they were first logged
+    """
+    queries: List[str] = []
+    with open(log_path, encoding="utf-8") as log_file:
+        for line in log_file:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            sql = entry["sql"].strip().rstrip(";")
+            if not entry.get("error") and sql not in queries:
+                queries.append(sql)
+
+    return queries
+
+
+class ScanPredicate(BaseModel):
+    """
+    A sequential scan found in a query plan, with the columns its filter uses.
+    """
+
+    table: str = Field(description="The table that was scanned sequentially")
+    equality_columns: List[str] = Field(default_factory=list, description="Columns compared with '='")
+    range_columns: List[str] = Field(default_factory=list, description="Columns compared with <, <=, > or >=")
+    rows_returned: float = Field(description="Rows that passed the filter")
+    rows_removed: float = Field(description="Rows discarded by the filter")
+    time_ms: float = Field(description="Actual total time of the scan node in milliseconds")
+
+
+class PlanAnalysis(BaseModel):
+    """
+    Result of running EXPLAIN (ANALYZE, BUFFERS) for one statement.
+    """
+
+    sql: str = Field(description="The explained statement")
+    planning_time_ms: float = Field(description="Planning time in milliseconds")
+    execution_time_ms: float = Field(description="Execution time in milliseconds")
+    shared_hit_blocks: int = Field(description="Shared buffer blocks found in cache")
+    shared_read_blocks: int = Field(description="Shared buffer blocks read from disk")
+    seq_scans: List[ScanPredicate] = Field(default_factory=list, description="Filtered sequential scans")
+
+
+class IndexRecommendation(BaseModel):
+    """
+    An index proposed by the advisor.
+    """
+
+    table: str = Field(description="The table to index")
+    columns: List[str] = Field(description="The indexed columns, in order")
+    method: str = Field(default="btree", description="The index access method, 'btree' or 'brin'")
+    query_count: int = Field(default=0, description="Number of analyzed queries the index would help")
+    seq_scan_time_ms: float = Field(default=0.0, description="Time spent in the sequential scans it replaces")
+
+    @property
+    def name(self) -> str:
+        suffix = "_brin" if self.method == "brin" else ""
+        return f"IDX_{self.table}_{'_'.join(self.columns)}{suffix}"
+
+    def create_sql(self) -> str:
+        """Return the CREATE INDEX statement for this recommendation."""
+        using = " USING BRIN" if self.method == "brin" else ""
+        columns = ", ".join(f'"{column}"' for column in self.columns)
+        return f'CREATE INDEX "{self.name}" ON "{self.table}"{using} ({columns}) '
+
+    def drop_sql(self, schema: str = "public") -> str:
+        """Return the DROP INDEX statement for this recommendation."""
+        return f'DROP INDEX "{schema}"."{self.name}"'
+
+
+class IndexAdvisor:
+    """
+    Advisor that proposes indexes for the SQL generated by the agent.
+
+    This class explains each statement against a local PostgreSQL instance,
+    looks for filtered sequential scans in the plans and turns the filtered
+    columns into composite B-tree or BRIN index recommendations.
+    """
+
+    def __init__(
+        self,
+        db_uri: str,
+        schema: str = "public",
+        min_rows_removed: int = 1000,
+        max_selectivity: float = 0.3,
+        brin_min_rows: int = 100000,
+        brin_min_correlation: float = 0.9,
+        statement_timeout_ms: int = 60000
+    ):
+        """
+        Initialize the Index Advisor.
+
+        Args:
+            db_uri: The database connection string
+            schema: The schema the statements are resolved against
+            min_rows_removed: Minimum rows a filter must discard before an index is proposed
+            max_selectivity: Maximum fraction of the table a filter may keep before an index is proposed
+            brin_min_rows: Minimum table size before a BRIN index is proposed for a range-only filter
+            brin_min_correlation: Minimum physical ordering correlation of the column for a BRIN index
+            statement_timeout_ms: Timeout applied to each explained statement
+        """
+        self.engine = create_engine(db_uri)
+        self.schema = schema
+        self.min_rows_removed = min_rows_removed
+        self.max_selectivity = max_selectivity
+        self.brin_min_rows = brin_min_rows
+        self.brin_min_correlation = brin_min_correlation
+        self.statement_timeout_ms = statement_timeout_ms
+
+    def explain(self, sql: str) -> PlanAnalysis:
+        """
+        Run EXPLAIN (ANALYZE, BUFFERS) for a statement.
+
+        The statement runs in a read-only transaction that is always rolled back.
+
+        Args:
+            sql: The SQL statement to explain
+
+        Returns:
+            PlanAnalysis: The timings, buffer usage and sequential scans of the plan
+        """
+        sql = sql.strip().rstrip(";")
+        if not READ_ONLY_PATTERN.match(sql):
+            raise ValueError(f"Only SELECT statements can be explained: {sql}")
+
+        with self.engine.connect() as conn:
+            transaction = conn.begin()
+            try:
+                conn.execute(text("SET TRANSACTION READ ONLY"))
+                self._configure_session(conn)
+                result = conn.exec_driver_sql(
+                    f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}",
+                    execution_options={"no_parameters": True}
+                )
+                explain_output = result.scalar()
+            finally:
+                transaction.rollback()
+
+        if isinstance(explain_output, str):
+            explain_output = json.loads(explain_output)
+
+        return self._analyze_plan(sql, explain_output[0])
+
+    def recommend(self, queries: List[str]) -> List[IndexRecommendation]:
+        """
+        Propose indexes for a workload of SQL statements.
+
+        Args:
+            queries: The SQL statements to analyze
+
+        Returns:
+            List[IndexRecommendation]: The proposed indexes, most beneficial first
+        """
+        recommendations: Dict[Tuple[str, str, Tuple[str, ...]], IndexRecommendation] = {}
+
+        with self.engine.connect() as conn:
+            self._configure_session(conn)
+
+            for sql in queries:
+                try:
+                    analysis = self.explain(sql)
+                except Exception as e:
+                    print(f"Skipping query that could not be explained: {e}")
+                    continue
+
+                for scan in analysis.seq_scans:
+                    candidate = self._candidate_for_scan(conn, scan)
+                    if candidate is None:
+                        continue
+
+                    key = (candidate.table, candidate.method, tuple(candidate.columns))
+                    recommendation = recommendations.setdefault(key, candidate)
+                    recommendation.query_count += 1
+                    recommendation.seq_scan_time_ms += scan.time_ms
+
+            conn.rollback()
+
+        return sorted(recommendations.values(), key=lambda r: r.seq_scan_time_ms, reverse=True)
+
+    def _configure_session(self, conn: Connection) -> None:
+        preparer = self.engine.dialect.identifier_preparer
+        conn.execute(text(f"SET LOCAL search_path TO {preparer.quote(self.schema)}"))
+        conn.execute(text(f"SET LOCAL statement_timeout = {int(self.statement_timeout_ms)}"))
+
+    def _analyze_plan(self, sql: str, explain_output: Dict[str, Any]) -> PlanAnalysis:
+        root = explain_output["Plan"]
+        seq_scans: List[ScanPredicate] = []
+
+        # Walk the plan tree looking for filtered sequential scans
+        nodes = [root]
+        while nodes:
+            node = nodes.pop()
+            nodes.extend(node.get("Plans", []))
+
+            if node.get("Node Type") != "Seq Scan" or "Filter" not in node:
+                continue
+
+            equality_columns, range_columns = self._parse_filter(node["Filter"])
+            # Per-loop averages; the loops of a parallel scan are workers running at the same time
+            loops = node.get("Actual Loops", 1)
+            time_loops = 1 if node.get("Parallel Aware") else loops
+            seq_scans.append(ScanPredicate(
+                table=node["Relation Name"],
+                equality_columns=equality_columns,
+                range_columns=range_columns,
+                rows_returned=node.get("Actual Rows", 0) * loops,
+                rows_removed=node.get("Rows Removed by Filter", 0) * loops,
+                time_ms=node.get("Actual Total Time", 0.0) * time_loops
+            ))
+
+        return PlanAnalysis(
+            sql=sql,
+            planning_time_ms=explain_output.get("Planning Time", 0.0),
+            execution_time_ms=explain_output.get("Execution Time", 0.0),
+            shared_hit_blocks=root.get("Shared Hit Blocks", 0),
+            shared_read_blocks=root.get("Shared Read Blocks", 0),
+            seq_scans=seq_scans
+        )
+
+    @staticmethod
+    def _parse_filter(filter_text: str) -> Tuple[List[str], List[str]]:
+        equality_columns: List[str] = []
+        range_columns: List[str] = []
+
+        matches = PLAIN_PREDICATE_PATTERN.findall(filter_text) + CAST_PREDICATE_PATTERN.findall(filter_text)
+        for column, operator in matches:
+            if operator in EQUALITY_OPERATORS and column not in equality_columns:
+                equality_columns.append(column)
+            elif operator in RANGE_OPERATORS and column not in range_columns:
+                range_columns.append(column)
+
+        # A column compared for equality does not need to appear again as a range column
+        range_columns = [column for column in range_columns if column not in equality_columns]
+
+        return sorted(equality_columns), range_columns
+
+    def _candidate_for_scan(self, conn: Connection, scan: ScanPredicate) -> Optional[IndexRecommendation]:
+        total_rows = scan.rows_returned + scan.rows_removed
+        if scan.rows_removed < self.min_rows_removed or total_rows == 0:
+            return None
+        if scan.rows_returned / total_rows > self.max_selectivity:
+            return None
+
+        # Equality columns lead the index, followed by at most one range column
+        columns = scan.equality_columns + scan.range_columns[:1]
+        if not columns:
+            return None
+
+        # Skip columns that an existing index already leads with
+        existing_indexes = self._existing_indexes(conn, scan.table)
+        if any(index[:len(columns)] == columns for index in existing_indexes):
+            return None
+
+        method = "btree"
+        if not scan.equality_columns and self._prefers_brin(conn, scan.table, columns[0], total_rows):
+            method = "brin"
+
+        return IndexRecommendation(table=scan.table, columns=columns, method=method)
+
+    def _existing_indexes(self, conn: Connection, table: str) -> List[List[str]]:
+        # Expression columns (attnum 0) and partial indexes cannot serve a plain column filter
+        result = conn.execute(text("""
+            SELECT array_agg(a.attname::text ORDER BY k.ord)
+            FROM pg_index i
+            JOIN LATERAL unnest(i.indkey) WITH ORDINALITY AS k(attnum, ord) ON true
+            JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = k.attnum
+            WHERE i.indrelid = to_regclass(:relation)
+            AND i.indpred IS NULL AND NOT (0 = ANY(i.indkey))
+            GROUP BY i.indexrelid
+        """), {"relation": f'"{self.schema}"."{table}"'})
+
+        return [list(row[0]) for row in result]
+
+    def _prefers_brin(self, conn: Connection, table: str, column: str, total_rows: float) -> bool:
+        # BRIN only pays off on large tables whose rows are stored in column order,
+        # such as append-mostly tables filtered on their date
+        if total_rows < self.brin_min_rows:
+            return False
+
+        correlation = conn.execute(text("""
+            SELECT correlation FROM pg_stats
+            WHERE schemaname = :schema AND tablename = :table AND attname = :column
+        """), {"schema": self.schema, "table": table, "column": column}).scalar()
+
+        return correlation is not None and abs(correlation) >= self.brin_min_correlation
+
+
+def render_migration(recommendations: List[IndexRecommendation], timestamp: int, name: str = "AddAdvisedIndexes") -> str:
+    """
+    Render index recommendations as a TypeORM migration.
+
+    Args:
+        recommendations: The indexes to create
+        timestamp: The migration timestamp in milliseconds
+        name: The migration name, without the timestamp
+
+    Returns:
+        str: The TypeScript source of the migration
+    """
+    class_name = f"{name}{timestamp}"
+    up = "\n".join(f"        await queryRunner.query(`{r.create_sql()}`);" for r in recommendations)
+    down = "\n".join(f"        await queryRunner.query(`{r.drop_sql()}`);" for r in reversed(recommendations))
+
+    return f"""import {{ MigrationInterface, QueryRunner }} from "typeorm";
+
+export class {class_name} implements MigrationInterface {{
+    name = '{class_name}'
+
+    public async up(queryRunner: QueryRunner): Promise<void> {{
+{up}
+    }}
+
+    public async down(queryRunner: QueryRunner): Promise<void> {{
+{down}
+    }}
+
+}}
+"""
+
+
+def write_migration(recommendations: List[IndexRecommendation], migrations_dir: str, name: str = "AddAdvisedIndexes") -> str:
+    """
+    Write index recommendations as a TypeORM migration file.
+
+    Args:
+        recommendations: The indexes to create
+        migrations_dir: The backend migrations directory
+        name: The migration name, without the timestamp
+
+    Returns:
+        str: The path of the written migration
+    """
+    timestamp = int(datetime.datetime.now().timestamp() * 1000)
+    path = os.path.join(migrations_dir, f"{timestamp}-{name}.ts")
+
+    with open(path, "w", encoding="utf-8") as migration_file:
+        migration_file.write(render_migration(recommendations, timestamp, name))
+
+    return path
+
+
+def main():
+    """
+    Analyze a query log and print, or write, the recommended indexes.
+    """
+    parser = argparse.ArgumentParser(description="Propose indexes for the SQL generated by the agent")
+    parser.add_argument("--log", default=os.getenv("SQL_LOG_PATH", "logs/generated_sql.jsonl"),
+                        help="JSON lines file written by SQLQueryLogger")
+    parser.add_argument("--schema", default="public", help="Schema the queries run against")
+    parser.add_argument("--migrations-dir", help="Write the recommendations as a migration into this directory")
+    args = parser.parse_args()
+
+    load_dotenv()
+
+    queries = load_query_log(args.log)
+    print(f"Analyzing {len(queries)} distinct queries from {args.log}")
+
+    advisor = IndexAdvisor(get_database_uri(), schema=args.schema)
+    recommendations = advisor.recommend(queries)
+
+    if not recommendations:
+        print("No indexes to recommend")
+        return
+
+    for recommendation in recommendations:
+        print(f"{recommendation.create_sql()}-- helps {recommendation.query_count} queries, "
+              f"{recommendation.seq_scan_time_ms:.1f} ms in sequential scans")
+
+    if args.migrations_dir:
+        path = write_migration(recommendations, args.migrations_dir)
+        print(f"Migration written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+import { MigrationInterface, QueryRunner } from "typeorm";
+
+export class AddQueryIndexes1792396800000 implements MigrationInterface {
+    name = 'AddQueryIndexes1792396800000'
+
+    public async up(queryRunner: QueryRunner): Promise<void> {
+        await queryRunner.query(`CREATE INDEX "IDX_expense_date" ON "expense" ("date") `);
+        await queryRunner.query(`CREATE INDEX "IDX_expense_category_date" ON "expense" ("category", "date") `);
+        await queryRunner.query(`CREATE INDEX "IDX_income_date" ON "income" ("date") `);
+        await queryRunner.query(`CREATE INDEX "IDX_income_source_date" ON "income" ("source", "date") `);
+        await queryRunner.query(`CREATE INDEX "IDX_investment_date" ON "investment" ("date") `);
+        await queryRunner.query(`CREATE INDEX "IDX_investment_type_date" ON "investment" ("type", "date") `);
+    }
+
+    public async down(queryRunner: QueryRunner): Promise<void> {
+        await queryRunner.query(`DROP INDEX "public"."IDX_investment_type_date"`);
+        await queryRunner.query(`DROP INDEX "public"."IDX_investment_date"`);
+        await queryRunner.query(`DROP INDEX "public"."IDX_income_source_date"`);
+        await queryRunner.query(`DROP INDEX "public"."IDX_income_date"`);
+        await queryRunner.query(`DROP INDEX "public"."IDX_expense_category_date"`);
+        await queryRunner.query(`DROP INDEX "public"."IDX_expense_date"`);
+    }
+
+}
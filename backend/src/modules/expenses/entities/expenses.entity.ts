@@ -1,6 +1,7 @@
 import { Transform } from 'class-transformer';
 import {
   Entity,
+  Index,
   Column,
   PrimaryGeneratedColumn,
   CreateDateColumn,
@@ -8,6 +9,8 @@ import {
 } from 'typeorm';
 
 @Entity()
+@Index('IDX_expense_date', ['date'])
+@Index('IDX_expense_category_date', ['category', 'date'])
 export class Expense {
   @PrimaryGeneratedColumn('uuid')
   id: string;
@@ -1,6 +1,7 @@
 import { Transform } from 'class-transformer';
 import {
   Entity,
+  Index,
   Column,
   PrimaryGeneratedColumn,
   CreateDateColumn,
@@ -8,6 +9,8 @@ import {
 } from 'typeorm';
 
 @Entity()
+@Index('IDX_income_date', ['date'])
+@Index('IDX_income_source_date', ['source', 'date'])
 export class Income {
   @PrimaryGeneratedColumn('uuid')
   id: string;
@@ -1,6 +1,7 @@
 import { Transform } from 'class-transformer';
 import {
   Entity,
+  Index,
   Column,
   PrimaryGeneratedColumn,
   CreateDateColumn,
@@ -8,6 +9,8 @@ import {
 } from 'typeorm';
 
 @Entity()
+@Index('IDX_investment_date', ['date'])
+@Index('IDX_investment_type_date', ['type', 'date'])
 export class Investment {
   @PrimaryGeneratedColumn('uuid')
   id: string;